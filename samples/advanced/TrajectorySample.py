@@ -16,6 +16,7 @@ __signature__ = 0x721b09dc1fe9a52aaf41a115fc3c1572
 
 
 from math import cos, sin, pi
+from time import sleep, time
 
 from pipython import GCSDevice, pitools
 from pipython.datarectools import getservotime
@@ -27,7 +28,8 @@ REFMODE = []  # reference the connected stages
 PERIOD = 5.0  # duration of one sine period in seconds as float
 CENTERPOS = (0.0, 0.0)  # center position of the circular motion as float for both axes
 AMPLITUDE = (10.0, 10.0)  # amplitude (i.e. diameter) of the circular motion as float for both axes
-BUFFERMIN = 200  # minimum number of points in buffer until motion is started
+BUFFERMIN = 100  # number of points in buffer below which new points are appended
+BUFFERMAX = 200  # number of points in buffer until motion is started and after each refill
 
 
 def main():
@@ -63,23 +65,53 @@ def runprofile(pidevice):
     print('trajectory timing: {}'.format(pidevice.qTGT()))
     print('clear existing trajectories')
     pidevice.TGC(trajectories)
+    pointtime = tgtvalue * servotime  # duration of one trajectory point in seconds
     pointnum = 0
+    minbuffer = None
     print('\r%s' % (' ' * 40)),
     while pointnum < numpoints:
-        if pidevice.qTGL(1)[1] < BUFFERMIN:
-            pidevice.TGA(trajectories, (xtrajectory[pointnum], ytrajectory[pointnum]))
-            pointnum += 1
-            print('\rappend point {}/{}'.format(pointnum, numpoints)),
-        if BUFFERMIN == pointnum:
+        numbuffer = pidevice.qTGL(1)[1]
+        querytime = time()
+        if pointnum:
+            minbuffer = numbuffer if minbuffer is None else min(minbuffer, numbuffer)
+        numappend = max(0, min(BUFFERMAX - numbuffer, numpoints - pointnum))
+        appendpoints(pidevice, trajectories, xtrajectory[pointnum:pointnum + numappend],
+                     ytrajectory[pointnum:pointnum + numappend])
+        if not pointnum:
             print('\nstarting trajectories')
             pidevice.TGS(trajectories)
+        pointnum += numappend
+        print('\rappend point {}/{}'.format(pointnum, numpoints)),
         if numpoints == pointnum:
-            print('\nfinishing trajectories')
-            pidevice.TGF(trajectories)
+            break
+        # the buffer drains by one point per 'pointtime' since the qTGL() query, so query it again when it
+        # reaches BUFFERMIN
+        sleep(max(0, (numbuffer + numappend - BUFFERMIN) * pointtime - (time() - querytime)))
+    print('\nfinishing trajectories')
+    pidevice.TGF(trajectories)
+    if minbuffer is not None:
+        print('lowest buffer level while streaming: {} points'.format(minbuffer))
     pitools.waitontrajectory(pidevice, trajectories)
     print('done')
 
 
+def appendpoints(pidevice, trajectories, xvalues, yvalues):
+    """Append points to the trajectories and query the controller error only once at the end.
+    @type pidevice : pipython.gcscommands.GCSCommands
+    @param trajectories : Trajectory IDs for the x and y values as list.
+    @param xvalues : Values to append to the first trajectory as list of floats.
+    @param yvalues : Values to append to the second trajectory as list of floats.
+    """
+    errcheck = pidevice.errcheck
+    pidevice.errcheck = False
+    try:
+        for xvalue, yvalue in zip(xvalues, yvalues):
+            pidevice.TGA(trajectories, (xvalue, yvalue))
+    finally:
+        pidevice.errcheck = errcheck
+    pidevice.checkerror()
+
+
 if __name__ == '__main__':
     # from pipython import PILogger, DEBUG, INFO, WARNING, ERROR, CRITICAL
     # PILogger.setLevel(DEBUG)
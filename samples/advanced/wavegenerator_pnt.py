@@ -14,7 +14,7 @@
 # http://www.physikinstrumente.com/download/TPSWNote_PhysikInstrumenteGmbH_Co_KG.pdf
 
 
-from time import sleep
+from time import sleep, time
 
 from pipython import GCSDevice, pitools
 
@@ -27,6 +27,8 @@ REFMODES = None  # reference the connected stages
 DATAFILE = r'wavegenerator_pnt.txt'
 NUMCYLES = 2  # number of cycles for wave generator output
 TABLERATE = 100  # duration of a wave table point in multiples of servo cycle times as integer
+BUNCHSIZE = 10  # number of wave points per WAV_PNT command, limited by the maximum command length of the controller
+VERIFY = False  # read back the wave tables with qGWD() after writing them
 
 
 def main():
@@ -48,14 +50,14 @@ def runwavegen(pidevice):
     wavedata = readwavedata()
     axes = pidevice.axes[:len(wavedata)]
     assert len(wavedata) == len(axes), 'this sample requires {} connected axes'.format(len(wavedata))
-    wavetables = range(1, len(wavedata) + 1)
-    wavegens = range(1, len(wavedata) + 1)
+    wavetables = list(range(1, len(wavedata) + 1))
+    wavegens = list(range(1, len(wavedata) + 1))
     if pidevice.HasWCL():  # you can remove this code block if your controller does not support WCL()
         print('clear wave tables {}'.format(wavetables))
         pidevice.WCL(wavetables)
-    for i, wavetable in enumerate(wavetables):
-        print('write wave points of wave table {} and axis {}'.format(wavetable, axes[i]))
-        pitools.writewavepoints(pidevice, wavetable, wavedata[i], bunchsize=10)
+    writewavedata(pidevice, wavetables, wavedata)
+    if VERIFY:
+        verifywavedata(pidevice, wavetables, wavedata)
     if pidevice.HasWSL():  # you can remove this code block if your controller does not support WSL()
         print('connect wave tables {} to wave generators {}'.format(wavetables, wavegens))
         pidevice.WSL(wavegens, wavetables)
@@ -79,6 +81,44 @@ def runwavegen(pidevice):
     print('done')
 
 
+def writewavedata(pidevice, wavetables, wavedata):
+    """Write wave points to wave tables, check the controller error only once and report the upload rate.
+    @type pidevice : pipython.gcscommands.GCSCommands
+    @param wavetables : Wave table IDs as list of integers.
+    @param wavedata : Datapoints as list of lists of values, one list for each wave table.
+    """
+    errcheck = pidevice.errcheck
+    pidevice.errcheck = False
+    starttime = time()
+    try:
+        for i, wavetable in enumerate(wavetables):
+            print('write wave points of wave table {} and axis {}'.format(wavetable, pidevice.axes[i]))
+            pitools.writewavepoints(pidevice, wavetable, wavedata[i], bunchsize=BUNCHSIZE)
+    finally:
+        pidevice.errcheck = errcheck
+    pidevice.checkerror()
+    duration = time() - starttime
+    numpoints = sum(len(points) for points in wavedata)
+    print('wrote {} wave points in {:.2f} seconds ({:.0f} points/s)'.format(numpoints, duration,
+                                                                           numpoints / max(duration, 1E-6)))
+
+
+def verifywavedata(pidevice, wavetables, wavedata):
+    """Read back the wave tables and print the maximum deviation from the written wave points.
+    @type pidevice : pipython.gcscommands.GCSCommands
+    @param wavetables : Wave table IDs as list of integers.
+    @param wavedata : Datapoints as list of lists of values, one list for each wave table.
+    """
+    print('read back wave tables {}'.format(wavetables))
+    pidevice.qGWD(wavetables, 1, len(wavedata[0]))
+    while pidevice.bufstate is not True:
+        sleep(0.05)
+    readback = pidevice.bufdata
+    for i, wavetable in enumerate(wavetables):
+        deviation = max(abs(float(value) - readback[i][j]) for j, value in enumerate(wavedata[i]))
+        print('wave table {}: maximum deviation {:g}'.format(wavetable, deviation))
+
+
 def readwavedata():
     """Read DATAFILE, must have a column for each wavetable.
     @return : Datapoints as list of lists of values.